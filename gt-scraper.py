@@ -1,27 +1,418 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 import json
 import csv
-from datetime import datetime
+from dataclasses import dataclass, fields
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import hashlib
+import random
 import re
+import mmap
 import shutil
-import time
+import sqlite3
+import multiprocessing
 import os
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 for _stream in (sys.stdout, sys.stderr):
     if hasattr(_stream, "reconfigure"):
         _stream.reconfigure(encoding="utf-8")
 
+MAX_CONCURRENT_FETCHES = 8
+USER_PAGE_URL = "https://teknoparrot.com/en/Highscore/UserSpecific?queryId={}"
+
+# fetch_page retries these statuses (and network errors) with exponential
+# backoff plus jitter, or after the server's Retry-After when a 429/503
+# sends one.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_AFTER_STATUSES = {429, 503}
+RETRY_BACKOFF_FACTOR = 0.3
+MAX_RETRY_AFTER = 60
+
+
+def retry_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number attempt + 1."""
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                when = None
+            if when and when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            seconds = (when - datetime.now(timezone.utc)).total_seconds() if when else None
+        if seconds is not None:
+            return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+    delay = RETRY_BACKOFF_FACTOR * 2 ** attempt
+    return delay + random.uniform(0, delay)
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes, via orjson when it is installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json_file(path):
+    """Parse a JSON file through a read-only mmap; orjson reads the mapped pages directly."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return json_loads(b'')  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if not orjson:
+                return json.loads(mm[:])
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def json_dumps(obj, indent=False):
+    """Serialize to UTF-8 bytes, via orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+# Bump whenever parse_scorecard's output changes so stale cached parses
+# are ignored.
+SCORECARD_SCHEMA_VERSION = 1
+
+# Compiled once at import instead of on every page.
+ENTRY_SPECIFIC_RE = re.compile(r'EntrySpecific', re.I)
+# Lets Strategy 1 build only the matching <a> tags instead of the whole page.
+ENTRY_LINK_STRAINER = SoupStrainer('a', href=ENTRY_SPECIFIC_RE)
+HIGHSCORE_ENTRY_RE = re.compile(r'/Highscore/Entry', re.I)
+ENTRY_DATA_ATTRS = ('data-href', 'data-url', 'data-link')
+ENTRY_DATA_SELECTOR = ', '.join(f'[{attr}*="entry" i]' for attr in ENTRY_DATA_ATTRS)
+ENTRY_URL_RE = re.compile(r'EntrySpecific|/Highscore/Entry', re.I)
+SCRIPT_JSON_RE = re.compile(r'(\{[^<]{20,}\}|\[[^<]{20,}\])')
+GT_GAME_IDS = re.compile(r'gameId=(gt\d+|ppl\d+)', re.I)
+GT_ID_WHITELIST = {'gt06', 'gt07', 'gt16', 'gt17', 'gt18', 'gt19', 'ppl13'}
+
+GT_TARGET_GAMES = [
+    'golden tee unplugged 2019',
+    'golden tee live 2019',
+    'golden tee unplugged 2018',
+    'golden tee live 2018',
+    'golden tee unplugged 2017',
+    'golden tee live 2017',
+    'golden tee unplugged 2016',
+    'golden tee live 2016',
+    'power putt live 2013',
+    'golden tee live 2007',
+    'golden tee live 2006',
+]
+# One alternation scanned in a single pass instead of a substring test
+# per target game.
+GT_GAME_NAME_RE = re.compile('|'.join(map(re.escape, GT_TARGET_GAMES)))
+
+PROFILE_LINK_SELECTORS = (
+    'a[href*="/ProfileViewer/Index/" i]',
+    'a[href*="/profile/" i]',
+    'a[href*="/user/" i]',
+)
+
+# ----------------------------------------------------------------------
+# Scorecard parsing — flexible selectors (selectolax / lexbor)
+# ----------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Scorecard:
+    """One scraped entry. Field order is the key order of the saved JSON."""
+    entry_url: str = ''
+    game: str | None = None
+    username: str | None = None
+    course: str | None = None
+    date: str | None = None
+    capture_id: str | None = None
+    holes: list | None = None
+    distances: list | None = None
+    pars: list | None = None
+    players: list | None = None
+    total_score: str | None = None
+    score_vs_par: str | None = None
+    gsp: str | None = None
+    youtube_video: str | None = None
+    youtube_embed: str | None = None
+    scraped_at: str | None = None
+    query_user_id: str | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: v for k, v in data.items() if k in SCORECARD_FIELDS})
+
+    def to_dict(self):
+        """Plain dict for JSON output; unset (None) fields are left out.
+
+        Once a player row exists the score fields are always written, as null
+        when player 1's row is too short; weekly-rollover.py relies on that
+        null to skip incomplete scorecards.
+        """
+        return {
+            name: value for name in SCORECARD_FIELDS
+            if (value := getattr(self, name)) is not None
+            or (name in PLAYER_SCORE_FIELDS and self.players)
+        }
+
+
+SCORECARD_FIELDS = tuple(f.name for f in fields(Scorecard))
+PLAYER_SCORE_FIELDS = frozenset(('total_score', 'score_vs_par', 'gsp'))
+
+
+@lru_cache(maxsize=None)
+def hole_mask(headers):
+    """Mask over headers[1:] marking numbered hole columns; cached per header row."""
+    labels = headers[1:]
+    return np.fromiter((h.isdigit() for h in labels), dtype=bool, count=len(labels))
+
+
+def _row_values(cells):
+    return [c.text(strip=True) for c in cells[1:]]
+
+
+def _first_value(cells):
+    return cells[1].text(strip=True) if len(cells) > 1 else None
+
+
+# Scorecard row label (first cell, uppercased) -> (field, value extractor).
+# Only rows with a known label have their remaining cells read.
+ROW_HANDLERS = {
+    'DISTANCE': ('distances', _row_values),
+    'PAR': ('pars', _row_values),
+    'COURSE:': ('course', _first_value),
+    'COURSE': ('course', _first_value),
+    'DATE:': ('date', _first_value),
+    'DATE': ('date', _first_value),
+    'CAPTURE ID:': ('capture_id', _first_value),
+    'CAPTURE ID': ('capture_id', _first_value),
+}
+
+
+def parse_scorecard(html, entry_url):
+    """Parse a scorecard page. Module-level so ProcessPoolExecutor can pickle it."""
+    tree = HTMLParser(html)
+    scorecard = Scorecard(entry_url=entry_url)
+
+    # Game title
+    for tag in ('h1', 'h2', 'title'):
+        elem = tree.css_first(tag)
+        if elem:
+            text = elem.text(strip=True)
+            if text:
+                scorecard.game = text
+                break
+
+    # Username — several possible structures
+    username = None
+    for selector in PROFILE_LINK_SELECTORS:
+        link = tree.css_first(selector)
+        if link:
+            btn = link.css_first('button, span') or link
+            username = btn.text(strip=True) or None
+            if username:
+                break
+    if not username:
+        for sel in ('button.btn-info', 'button.btn-primary', '.player-name', '.username', '.badge'):
+            elem = tree.css_first(sel)
+            if elem:
+                text = elem.text(strip=True)
+                if text and len(text) < 50:
+                    username = text
+                    break
+    if username:
+        scorecard.username = username
+
+    # Scorecard table
+    table = (
+        tree.css_first('table[class*="scorecard" i]') or
+        tree.css_first('table[class*="score" i]') or
+        tree.css_first('table')
+    )
+    if not table:
+        return scorecard
+
+    holes, player_scores = [], []
+    tbody = table.css_first('tbody')
+    rows = tbody.css('tr') if tbody else table.css('tr')
+
+    for row in rows:
+        cells = row.css('td')
+        if not cells:
+            continue
+        first = cells[0].text(strip=True).upper()
+
+        handler = ROW_HANDLERS.get(first)
+        if handler:
+            field, extract = handler
+            value = extract(cells)
+            if value is not None:
+                setattr(scorecard, field, value)
+        elif first.startswith('PLAYER'):
+            parts = first.split()
+            num = parts[1] if len(parts) > 1 else '1'
+            player_scores.append({'player': num, 'scores': _row_values(cells)})
+
+    thead = table.css_first('thead')
+    if thead:
+        header_row = thead.css_first('tr')
+        if header_row:
+            holes = [c.text(strip=True) for c in header_row.css('th, td')]
+
+    scorecard.holes = holes
+    scorecard.distances = scorecard.distances or []
+    scorecard.pars = scorecard.pars or []
+    scorecard.players = player_scores
+
+    if player_scores:
+        p1 = player_scores[0]['scores']
+        scorecard.total_score = p1[-3] if len(p1) > 3 else None
+        scorecard.score_vs_par = p1[-2] if len(p1) > 2 else None
+        scorecard.gsp = p1[-1] if len(p1) > 0 else None
+
+    # YouTube video
+    for card in tree.css('div[class*="card" i]'):
+        iframe = card.css_first('iframe')
+        src = iframe.attributes.get('src') if iframe else None
+        if src:
+            if 'youtube.com/embed/' in src:
+                vid = src.split('youtube.com/embed/')[1].split('?')[0]
+                scorecard.youtube_video = f"https://www.youtube.com/watch?v={vid}"
+                scorecard.youtube_embed = src
+            else:
+                scorecard.youtube_video = src
+            break
+
+    return scorecard
+
+
+class ScorecardCache:
+    """Parsed scorecards keyed by entry URL, persisted in SQLite."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS scorecards '
+            '(url TEXT PRIMARY KEY, schema INTEGER NOT NULL, data TEXT NOT NULL)'
+        )
+
+    def get(self, url):
+        row = self.conn.execute(
+            'SELECT data FROM scorecards WHERE url = ? AND schema = ?',
+            (url, SCORECARD_SCHEMA_VERSION),
+        ).fetchone()
+        return Scorecard.from_dict(json_loads(row[0])) if row else None
+
+    def put(self, url, scorecard):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO scorecards (url, schema, data) VALUES (?, ?, ?)',
+            (url, SCORECARD_SCHEMA_VERSION, json_dumps(scorecard.to_dict()).decode('utf-8')),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class ResponseCache:
+    """Last ETag/Last-Modified and body per URL, for conditional GETs."""
+
+    def __init__(self, path, body_dir):
+        self.body_dir = body_dir
+        os.makedirs(body_dir, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses '
+            '(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_path TEXT NOT NULL)'
+        )
+
+    def _row(self, url):
+        return self.conn.execute(
+            'SELECT etag, last_modified, body_path FROM responses WHERE url = ?', (url,)
+        ).fetchone()
+
+    def validators(self, url):
+        """If-None-Match / If-Modified-Since headers for url, if we hold its body."""
+        row = self._row(url)
+        if not row or not os.path.exists(row[2]):
+            return {}
+        etag, last_modified, _ = row
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def load_body(self, url):
+        row = self._row(url)
+        if not row:
+            return None
+        try:
+            with open(row[2], 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not (etag or last_modified):
+            return  # nothing to revalidate against next time
+        body_path = os.path.join(self.body_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html')
+        with open(body_path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO responses (url, etag, last_modified, body_path) VALUES (?, ?, ?, ?)',
+            (url, etag, last_modified, body_path),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
 class TeknoParrotScraper:
     def __init__(self, user_ids=None):
         self.user_ids = []
-        self.session = requests.Session()
-        self.session.headers.update({
+        # The httpx.AsyncClient is opened by main() inside the running event
+        # loop; every fetch shares it (and its connection pool).
+        self.session = None
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
-        })
+            # Accept-Encoding is left to httpx, which only offers br when a
+            # brotli decoder is importable.
+        }
+        # Caps in-flight requests to teknoparrot.com so concurrent scorecard
+        # fetches stay polite.
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        # Pool that parse_scorecard runs on; None falls back to the loop's
+        # default thread pool.
+        self.executor = None
+        # Optional ScorecardCache; lets repeat runs skip fetching and
+        # parsing scorecards that were already seen.
+        self.scorecard_cache = None
+        # Optional ResponseCache; landing pages the server marks unchanged
+        # (304) are served from disk instead of being downloaded again.
+        self.response_cache = None
+        # Optional binary file; every accepted entry is appended to it as one
+        # JSON line the moment it is scraped (see append_to_journal).
+        self.journal = None
 
         if user_ids:
             if isinstance(user_ids, list):
@@ -36,8 +427,7 @@ class TeknoParrotScraper:
         users = []
         if filepath.endswith('.json'):
             try:
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
+                data = load_json_file(filepath)
                 if isinstance(data, list) and all(isinstance(item, str) for item in data):
                     users = data
                 elif isinstance(data, dict):
@@ -69,54 +459,68 @@ class TeknoParrotScraper:
             print(f"Loaded {len(users)} users from {filepath}")
         return users
 
-    def fetch_page(self, url, as_json=False):
-        """Fetch a page with retry logic. Returns text or parsed JSON dict."""
+    async def fetch_page(self, url, as_json=False, revalidate=False):
+        """Fetch a page with retry logic. Returns text or parsed JSON dict.
+
+        revalidate routes the fetch through self.response_cache; only landing
+        pages ask for it, since scorecards are never requested twice.
+        """
         max_retries = 3
+        response_cache = self.response_cache if revalidate else None
         headers = {}
         if as_json:
             headers['Accept'] = 'application/json'
+        if response_cache:
+            headers.update(response_cache.validators(url))
         for attempt in range(max_retries):
+            retry_after = None
             try:
-                response = self.session.get(url, timeout=30, headers=headers)
-                response.raise_for_status()
+                text = None
+                async with self.semaphore:
+                    response = await self.session.get(url, headers=headers)
+                    if response.status_code == 304:
+                        text = response_cache.load_body(url) if response_cache else None
+                        if text is None:
+                            # Stored body went missing; ask again unconditionally
+                            # within this same attempt.
+                            headers.pop('If-None-Match', None)
+                            headers.pop('If-Modified-Since', None)
+                            response = await self.session.get(url, headers=headers)
+                if text is None:
+                    if response.status_code in RETRY_AFTER_STATUSES:
+                        retry_after = response.headers.get('Retry-After')
+                    response.raise_for_status()
+                    text = response.text
+                    if response_cache:
+                        response_cache.store(url, response)
                 if as_json:
-                    return response.json()
-                return response.text
-            except (requests.exceptions.RequestException, ValueError) as e:
+                    return json_loads(text)
+                return text
+            except httpx.HTTPStatusError as e:
+                print(f"  Error fetching {url} (attempt {attempt + 1}/{max_retries}): HTTP {e.response.status_code}")
+                if e.response.status_code not in RETRY_STATUSES:
+                    return None
+            except httpx.HTTPError as e:
                 print(f"  Error fetching {url} (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)
+            except ValueError as e:
+                print(f"  Error decoding {url}: {e}")
+                return None
+            if attempt < max_retries - 1:
+                await asyncio.sleep(retry_delay(attempt, retry_after))
         return None
 
     def is_golden_tee_game(self, game_name):
-        if not game_name:
-            return False
-        target_games = [
-            'golden tee unplugged 2019',
-            'golden tee live 2019',
-            'golden tee unplugged 2018',
-            'golden tee live 2018',
-            'golden tee unplugged 2017',
-            'golden tee live 2017',
-            'golden tee unplugged 2016',
-            'golden tee live 2016',
-            'power putt live 2013',
-            'golden tee live 2007',
-            'golden tee live 2006',
-        ]
-        game_lower = game_name.lower()
-        return any(t in game_lower for t in target_games)
+        return bool(game_name and GT_GAME_NAME_RE.search(game_name.lower()))
 
     # ------------------------------------------------------------------
     # Entry link extraction — four strategies + debug fallback
     # ------------------------------------------------------------------
 
-    def extract_entry_links(self, html, user_id):
-        soup = BeautifulSoup(html, 'html.parser')
+    async def extract_entry_links(self, html, user_id):
         entry_links = []
 
         # Strategy 1: original <a href> containing "EntrySpecific"
-        links = soup.find_all('a', href=re.compile(r'EntrySpecific', re.I))
+        links = BeautifulSoup(html, 'lxml', parse_only=ENTRY_LINK_STRAINER).find_all('a')
         for link in links:
             href = link.get('href', '')
             if href:
@@ -127,8 +531,11 @@ class TeknoParrotScraper:
             print(f"  Strategy 1 found {len(entry_links)} links")
             return entry_links
 
+        # The remaining strategies need the full document.
+        soup = BeautifulSoup(html, 'lxml')
+
         # Strategy 2: any <a href> with "/Highscore/Entry" in path
-        links = soup.find_all('a', href=re.compile(r'/Highscore/Entry', re.I))
+        links = soup.find_all('a', href=HIGHSCORE_ENTRY_RE)
         for link in links:
             href = link.get('href', '')
             if href:
@@ -139,10 +546,13 @@ class TeknoParrotScraper:
             print(f"  Strategy 2 found {len(entry_links)} links")
             return entry_links
 
-        # Strategy 3: data-href / data-url attributes
-        for attr in ('data-href', 'data-url', 'data-link'):
-            for elem in soup.find_all(attrs={attr: re.compile(r'Entry', re.I)}):
+        # Strategy 3: data-href / data-url / data-link attributes, matched
+        # in a single pass over the tree
+        for elem in soup.select(ENTRY_DATA_SELECTOR):
+            for attr in ENTRY_DATA_ATTRS:
                 href = elem.get(attr, '')
+                if 'entry' not in href.lower():
+                    continue
                 if not href.startswith('http'):
                     href = f"https://teknoparrot.com{href}"
                 entry_links.append({'url': href, 'game': elem.get_text(strip=True)})
@@ -157,7 +567,7 @@ class TeknoParrotScraper:
             return embedded
 
         # Strategy 5: direct API attempt (JSON endpoint variants)
-        api_links = self._try_api_endpoint(user_id)
+        api_links = await self._try_api_endpoint(user_id)
         if api_links:
             print(f"  Strategy 5 found {len(api_links)} links via API endpoint")
             return api_links
@@ -181,7 +591,7 @@ class TeknoParrotScraper:
                     pass
                 continue
             # Inline JS with embedded JSON arrays/objects
-            for match in re.finditer(r'(\{[^<]{20,}\}|\[[^<]{20,}\])', text):
+            for match in SCRIPT_JSON_RE.finditer(text):
                 chunk = match.group(0)
                 if 'Entry' not in chunk:
                     continue
@@ -197,7 +607,7 @@ class TeknoParrotScraper:
             return
         if isinstance(node, dict):
             for k, v in node.items():
-                if isinstance(v, str) and re.search(r'EntrySpecific|/Highscore/Entry', v, re.I):
+                if isinstance(v, str) and ENTRY_URL_RE.search(v):
                     href = v if v.startswith('http') else f"https://teknoparrot.com{v}"
                     game = node.get('game') or node.get('gameName') or node.get('title') or ''
                     results.append({'url': href, 'game': game})
@@ -207,7 +617,7 @@ class TeknoParrotScraper:
             for item in node:
                 self._walk_json_for_entries(item, results, depth + 1)
 
-    def _try_api_endpoint(self, user_id):
+    async def _try_api_endpoint(self, user_id):
         """Try common REST/JSON API patterns that TeknoParrot might use."""
         candidates = [
             f"https://teknoparrot.com/api/Highscore/UserSpecific?queryId={user_id}",
@@ -215,7 +625,7 @@ class TeknoParrotScraper:
             f"https://teknoparrot.com/en/api/Highscore/UserSpecific?queryId={user_id}",
         ]
         for url in candidates:
-            data = self.fetch_page(url, as_json=True)
+            data = await self.fetch_page(url, as_json=True)
             if not data:
                 continue
             links = []
@@ -249,146 +659,34 @@ class TeknoParrotScraper:
             # Check for likely JS-rendered page
             if len(html) < 5000 and not soup.find('table'):
                 print("  LIKELY CAUSE: Page appears JavaScript-rendered.")
-                print("  The HTML returned by requests has no table/data — try adding Playwright/Selenium.")
+                print("  The HTML returned has no table/data — try adding Playwright/Selenium.")
             print(f"  Full HTML saved to: {debug_file}")
         except Exception as e:
             print(f"  Could not save debug file: {e}")
 
-    # ------------------------------------------------------------------
-    # Scorecard parsing — flexible selectors
-    # ------------------------------------------------------------------
-
     def parse_scorecard(self, html, entry_url):
-        soup = BeautifulSoup(html, 'html.parser')
-        scorecard_data = {'entry_url': entry_url}
-
-        # Game title
-        for tag in ('h1', 'h2', 'title'):
-            elem = soup.find(tag)
-            if elem:
-                text = elem.get_text(strip=True)
-                if text:
-                    scorecard_data['game'] = text
-                    break
-
-        # Username — several possible structures
-        username = None
-        for pattern in (r'/ProfileViewer/Index/', r'/profile/', r'/user/'):
-            link = soup.find('a', href=re.compile(pattern, re.I))
-            if link:
-                btn = link.find(['button', 'span']) or link
-                username = btn.get_text(strip=True) or None
-                if username:
-                    break
-        if not username:
-            for sel in ('button.btn-info', 'button.btn-primary', '.player-name', '.username', '.badge'):
-                elem = soup.select_one(sel)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    if text and len(text) < 50:
-                        username = text
-                        break
-        if username:
-            scorecard_data['username'] = username
-
-        # Scorecard table
-        table = (
-            soup.find('table', class_=re.compile(r'scorecard', re.I)) or
-            soup.find('table', class_=re.compile(r'score', re.I)) or
-            soup.find('table')
-        )
-        if not table:
-            return scorecard_data
-
-        holes, distances, pars, player_scores = [], [], [], []
-        tbody = table.find('tbody')
-        rows = tbody.find_all('tr') if tbody else table.find_all('tr')
-
-        for row in rows:
-            cells = row.find_all('td')
-            if not cells:
-                continue
-            row_text = [c.get_text(strip=True) for c in cells]
-            if not row_text:
-                continue
-            first = row_text[0].upper().strip()
-
-            if first == 'DISTANCE':
-                distances = row_text[1:]
-            elif first == 'PAR':
-                pars = row_text[1:]
-            elif first.startswith('PLAYER'):
-                num = first.split()[1] if len(first.split()) > 1 else '1'
-                player_scores.append({'player': num, 'scores': row_text[1:]})
-            elif first in ('COURSE:', 'COURSE'):
-                if len(cells) > 1:
-                    scorecard_data['course'] = cells[1].get_text(strip=True)
-            elif first in ('DATE:', 'DATE'):
-                if len(cells) > 1:
-                    scorecard_data['date'] = cells[1].get_text(strip=True)
-            elif first in ('CAPTURE ID:', 'CAPTURE ID'):
-                if len(cells) > 1:
-                    scorecard_data['capture_id'] = cells[1].get_text(strip=True)
-
-        thead = table.find('thead')
-        if thead:
-            header_row = thead.find('tr')
-            if header_row:
-                holes = [c.get_text(strip=True) for c in header_row.find_all(['th', 'td'])]
-
-        scorecard_data.update({
-            'holes': holes, 'distances': distances, 'pars': pars, 'players': player_scores
-        })
-
-        if player_scores:
-            p1 = player_scores[0]['scores']
-            try:
-                scorecard_data['total_score'] = p1[-3] if len(p1) > 3 else None
-                scorecard_data['score_vs_par'] = p1[-2] if len(p1) > 2 else None
-                scorecard_data['gsp'] = p1[-1] if len(p1) > 0 else None
-            except (IndexError, ValueError):
-                pass
-
-        # YouTube video
-        for card in soup.find_all('div', class_=re.compile(r'card', re.I)):
-            header = card.find(['h3', 'h4', 'div'], string=re.compile(r'video', re.I))
-            if not header:
-                header = card.find(string=re.compile(r'video', re.I))
-            iframe = card.find('iframe')
-            if iframe and iframe.get('src'):
-                src = iframe['src']
-                if 'youtube.com/embed/' in src:
-                    vid = src.split('youtube.com/embed/')[1].split('?')[0]
-                    scorecard_data['youtube_video'] = f"https://www.youtube.com/watch?v={vid}"
-                    scorecard_data['youtube_embed'] = src
-                else:
-                    scorecard_data['youtube_video'] = src
-                break
-
-        return scorecard_data
+        return parse_scorecard(html, entry_url)
 
     # ------------------------------------------------------------------
     # Scraping orchestration
     # ------------------------------------------------------------------
 
-    def scrape_user_entries(self, user_id, known_urls=None):
+    async def scrape_user_entries(self, user_id, known_urls=None, html=None):
+        """Scrape one user; html is their already-fetched landing page, if any."""
         known_urls = known_urls or set()
-        base_url = f"https://teknoparrot.com/en/Highscore/UserSpecific?queryId={user_id}"
         print(f"\n{'=' * 60}\nScraping: {user_id}\n{'=' * 60}")
 
-        html = self.fetch_page(base_url)
+        if html is None:
+            html = await self.fetch_page(USER_PAGE_URL.format(user_id), revalidate=True)
         if not html:
             return []
 
-        entry_links = self.extract_entry_links(html, user_id)
+        entry_links = await self.extract_entry_links(html, user_id)
         if not entry_links:
             return []
 
         # Pre-filter to known Golden Tee / Power Putt game IDs so we don't
         # waste a network round-trip on every non-GT entry (arcade racers, etc.)
-        GT_GAME_IDS = re.compile(r'gameId=(gt\d+|ppl\d+)', re.I)
-        GT_ID_WHITELIST = {'gt06', 'gt07', 'gt16', 'gt17', 'gt18', 'gt19', 'ppl13'}
-
         def is_gt_url(url):
             m = GT_GAME_IDS.search(url)
             if not m:
@@ -409,52 +707,72 @@ class TeknoParrotScraper:
             print(f"  {cached} already cached; fetching {len(new_links)} new entr{'y' if len(new_links) == 1 else 'ies'}")
         else:
             print(f"  Found {len(new_links)} entries to check")
-        user_entries = []
 
-        for i, entry_info in enumerate(new_links, 1):
-            scorecard_html = self.fetch_page(entry_info['url'])
+        # Scorecards are fetched concurrently (bounded by self.semaphore);
+        # gather() keeps results in link order.
+        results = await asyncio.gather(*[
+            self._scrape_entry(user_id, entry_info, i, len(new_links))
+            for i, entry_info in enumerate(new_links, 1)
+        ])
+        return [entry for entry in results if entry]
+
+    async def _scrape_entry(self, user_id, entry_info, i, total):
+        url = entry_info['url']
+        scorecard = self.scorecard_cache.get(url) if self.scorecard_cache else None
+        if scorecard is None:
+            scorecard_html = await self.fetch_page(url)
             if not scorecard_html:
-                continue
-
-            scorecard_data = self.parse_scorecard(scorecard_html, entry_info['url'])
-            if not scorecard_data.get('game'):
-                scorecard_data['game'] = entry_info.get('game', '')
-
-            if not self.is_golden_tee_game(scorecard_data.get('game', '')):
-                continue
-
-            # Defense against cross-user contamination: this scorecard was
-            # reached via user_id's own UserSpecific page, but occasionally
-            # (session/caching quirks on TeknoParrot's end) the page returns
-            # a link to a different player's entry entirely. Verify the
-            # scorecard actually belongs to the user we think we're scraping
-            # before keeping it — if it's someone else's, their own scrape
-            # pass will pick it up correctly.
-            scraped_username = scorecard_data.get('username', '')
-            if scraped_username and scraped_username.lower() != user_id.lower():
-                print(f"  SKIP mismatch: expected {user_id}, scorecard belongs to {scraped_username} ({entry_info['url']})")
-                continue
-
-            scorecard_data['scraped_at'] = datetime.now().isoformat()
-            scorecard_data['query_user_id'] = user_id
-            user_entries.append(scorecard_data)
-
-            video_tag = ' [VIDEO]' if scorecard_data.get('youtube_video') else ''
-            print(f"  OK {i}/{len(new_links)} | {scorecard_data.get('game')} | {scorecard_data.get('course')} | {scorecard_data.get('total_score')}{video_tag}")
-            time.sleep(1)
-
-        return user_entries
-
-    def scrape_all_users(self, known_urls=None):
-        all_entries = []
+                return None
+
+            loop = asyncio.get_running_loop()
+            scorecard = await loop.run_in_executor(
+                self.executor, parse_scorecard, scorecard_html, url)
+            # Only remember pages that actually carried a scorecard table,
+            # so an error page is retried next run.
+            if self.scorecard_cache and scorecard.holes is not None:
+                self.scorecard_cache.put(url, scorecard)
+        if not scorecard.game:
+            scorecard.game = entry_info.get('game', '')
+
+        if not self.is_golden_tee_game(scorecard.game):
+            return None
+
+        # Defense against cross-user contamination: this scorecard was
+        # reached via user_id's own UserSpecific page, but occasionally
+        # (session/caching quirks on TeknoParrot's end) the page returns
+        # a link to a different player's entry entirely. Verify the
+        # scorecard actually belongs to the user we think we're scraping
+        # before keeping it — if it's someone else's, their own scrape
+        # pass will pick it up correctly.
+        scraped_username = scorecard.username
+        if scraped_username and scraped_username.lower() != user_id.lower():
+            print(f"  SKIP mismatch: expected {user_id}, scorecard belongs to {scraped_username} ({entry_info['url']})")
+            return None
+
+        scorecard.scraped_at = datetime.now().isoformat()
+        scorecard.query_user_id = user_id
+
+        self.append_to_journal(scorecard)
+
+        video_tag = ' [VIDEO]' if scorecard.youtube_video else ''
+        print(f"  OK {user_id} {i}/{total} | {scorecard.game} | {scorecard.course} | {scorecard.total_score}{video_tag}")
+        return scorecard
+
+    async def scrape_all_users(self, known_urls=None):
         if not self.user_ids:
             return []
-        for idx, user_id in enumerate(self.user_ids, 1):
-            print(f"\n[User {idx}/{len(self.user_ids)}]")
-            all_entries.extend(self.scrape_user_entries(user_id, known_urls))
-            if idx < len(self.user_ids):
-                time.sleep(2)
-        return all_entries
+        # Fetch every landing page in one burst, then expand all users'
+        # scorecards concurrently; self.semaphore bounds the total load.
+        print(f"\nFetching {len(self.user_ids)} user pages")
+        landing_pages = await asyncio.gather(*[
+            self.fetch_page(USER_PAGE_URL.format(user_id), revalidate=True)
+            for user_id in self.user_ids
+        ])
+        per_user = await asyncio.gather(*[
+            self.scrape_user_entries(user_id, known_urls, html or '')
+            for user_id, html in zip(self.user_ids, landing_pages)
+        ])
+        return [entry for entries in per_user for entry in entries]
 
     # ------------------------------------------------------------------
     # Output
@@ -463,38 +781,47 @@ class TeknoParrotScraper:
     def save_to_csv(self, entries, filename='golden_tee_leaderboard.csv'):
         if not entries:
             return
+        standard_keys = ['game', 'username', 'query_user_id', 'course', 'date', 'total_score', 'score_vs_par', 'gsp', 'youtube_video', 'entry_url']
         flattened = []
         for entry in entries:
-            flat = {
-                'game': entry.get('game', ''), 'username': entry.get('username', ''),
-                'query_user_id': entry.get('query_user_id', ''), 'course': entry.get('course', ''),
-                'date': entry.get('date', ''), 'capture_id': entry.get('capture_id', ''),
-                'total_score': entry.get('total_score', ''), 'score_vs_par': entry.get('score_vs_par', ''),
-                'gsp': entry.get('gsp', ''), 'youtube_video': entry.get('youtube_video', ''),
-                'entry_url': entry.get('entry_url', ''), 'scraped_at': entry.get('scraped_at', '')
-            }
-            if entry.get('players'):
-                p1_scores = entry['players'][0].get('scores', [])
-                headers = entry.get('holes', [])
-                hole_n = 0
-                for i, score in enumerate(p1_scores):
-                    if (i + 1) < len(headers) and headers[i + 1].isdigit():
-                        hole_n += 1
-                        flat[f'hole_{hole_n}'] = score
-                    elif (i + 1) >= len(headers):
-                        break
+            flat = {key: getattr(entry, key) for key in standard_keys}
+            if entry.players:
+                # Score i lines up with header i + 1 (header 0 is the
+                # HOLE label); keep only the numbered-hole columns.
+                p1_scores = entry.players[0].get('scores', [])
+                mask = hole_mask(tuple(entry.holes or ()))
+                n = min(len(p1_scores), len(mask))
+                hole_scores = np.asarray(p1_scores[:n], dtype=object)[mask[:n]]
+                flat.update({f'hole_{i}': score for i, score in enumerate(hole_scores, 1)})
             flattened.append(flat)
 
         all_keys = set().union(*(d.keys() for d in flattened))
-        standard_keys = ['game', 'username', 'query_user_id', 'course', 'date', 'total_score', 'score_vs_par', 'gsp', 'youtube_video', 'entry_url']
         hole_keys = sorted([k for k in all_keys if k.startswith('hole_')], key=lambda x: int(x.split('_')[1]))
 
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=standard_keys + hole_keys, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(flattened)
+        # pandas' C writer; None cells are written empty like DictWriter did.
+        df = pd.DataFrame.from_records(flattened, columns=standard_keys + hole_keys)
+        df.to_csv(filename, index=False, encoding='utf-8', lineterminator='\r\n')
         print(f"\n✓ Saved {filename}")
 
+    def append_to_journal(self, entry):
+        if not self.journal:
+            return
+        self.journal.write(json_dumps(entry.to_dict()) + b'\n')
+        self.journal.flush()
+
+    def load_journal(self, filename):
+        """Read entries left behind by an interrupted run (NDJSON)."""
+        entries = []
+        if not os.path.exists(filename):
+            return entries
+        with open(filename, 'rb') as f:
+            for line in f:
+                try:
+                    entries.append(Scorecard.from_dict(json_loads(line)))
+                except json.JSONDecodeError:
+                    pass  # torn final line from a crash mid-write
+        return entries
+
     def save_to_json(self, entries, filename='golden_tee_leaderboard.json'):
         if not entries:
             return
@@ -504,8 +831,8 @@ class TeknoParrotScraper:
             shutil.copy2(backup1, backup2)
         if os.path.exists(filename):
             shutil.copy2(filename, backup1)
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb') as f:
+            f.write(json_dumps([entry.to_dict() for entry in entries], indent=True))
         print(f"✓ Saved {filename}  (backups: .1.json, .2.json)")
 
 
@@ -527,15 +854,53 @@ def main():
     existing_entries = []
     if os.path.exists(leaderboard_file):
         try:
-            with open(leaderboard_file, "r", encoding="utf-8") as f:
-                existing_entries = json.load(f)
+            existing_entries = [Scorecard.from_dict(e) for e in load_json_file(leaderboard_file)]
         except (json.JSONDecodeError, OSError) as e:
             print(f"Warning: could not read existing {leaderboard_file}: {e}")
-    known_urls = {e.get("entry_url") for e in existing_entries if e.get("entry_url")}
+    known_urls = {e.entry_url for e in existing_entries if e.entry_url}
     print(f"Loaded {len(existing_entries)} cached entries ({len(known_urls)} known scorecards)")
 
     scraper = TeknoParrotScraper(user_json)
-    new_entries = scraper.scrape_all_users(known_urls)
+
+    # Entries scraped by a run that died before saving are still in the
+    # journal; pick them up instead of fetching them again.
+    journal_file = os.path.join(application_path, "golden_tee_leaderboard.partial.ndjson")
+    recovered = [e for e in scraper.load_journal(journal_file) if e.entry_url not in known_urls]
+    if recovered:
+        print(f"Recovered {len(recovered)} entries from interrupted run ({journal_file})")
+        known_urls |= {e.entry_url for e in recovered}
+
+    scraper.scorecard_cache = ScorecardCache(os.path.join(application_path, "tp_scorecards.sqlite"))
+    scraper.response_cache = ResponseCache(
+        os.path.join(application_path, "tp_cache.sqlite"),
+        os.path.join(application_path, "tp_cache"),
+    )
+
+    async def run():
+        # Every request goes to teknoparrot.com; over HTTP/2 the concurrent
+        # fetches share one multiplexed TLS connection instead of queueing
+        # behind each other on separate keep-alive sockets.
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=scraper.headers,
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+        ) as client:
+            scraper.session = client
+            return await scraper.scrape_all_users(known_urls)
+
+    # Scorecard parsing is CPU-bound; spread it over every core rather
+    # than blocking the event loop between fetches.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor, \
+            open(journal_file, "ab") as journal:
+        scraper.executor = executor
+        scraper.journal = journal
+        try:
+            new_entries = recovered + asyncio.run(run())
+        finally:
+            scraper.scorecard_cache.close()
+            scraper.response_cache.close()
     entries = existing_entries + new_entries
 
     if new_entries:
@@ -545,13 +910,18 @@ def main():
         print(f"  {len(new_entries)} new entr{'y' if len(new_entries) == 1 else 'ies'} added ({len(entries)} total)")
         games = {}
         for e in new_entries:
-            g = e.get('game', 'Unknown')
+            g = e.game or 'Unknown'
             games[g] = games.get(g, 0) + 1
         for g, c in games.items():
             print(f"  {g}: {c} new entries")
     else:
         print("\nNo new entries found since last scrape — nothing to save.")
 
+    # Everything in the journal is now in the saved files.
+    os.remove(journal_file)
+
 
 if __name__ == "__main__":
+    # Frozen Windows builds re-run this script in each pool worker.
+    multiprocessing.freeze_support()
     main()